@@ -1,11 +1,24 @@
 from datetime import datetime, timedelta
 from airflow import DAG
-from airflow.operators.bash import BashOperator
+from airflow.operators.python import PythonOperator
 import os
+import sys
 
 # Get project root directory dynamically
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Make the pipeline package importable from the scheduler/worker processes
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.pipeline.xcom_backend import remove_run_files
+from src.pipeline.transformation.tasks import (
+    fetch_monsters_task,
+    select_random_monsters_task,
+    fetch_monster_details_task,
+    save_monsters_task
+)
+
 default_args = {
     'owner': 'angelasmp',
     'depends_on_past': False,
@@ -16,7 +29,7 @@ default_args = {
     'retry_delay': timedelta(minutes=1),
 }
 
-# Simplified DAG using BashOperator calling task functions - mais robusto
+# DAG running the task functions in-process, passing data between them via XCom
 dag = DAG(
     'dnd_monster_pipeline',
     default_args=default_args,
@@ -24,82 +37,37 @@ dag = DAG(
     schedule=None,  # Manual trigger only
     catchup=False,
     tags=['dnd', 'api', 'pipeline'],
+    # Spilled XCom payloads live in tmpfs (RAM), drop them once the run succeeded
+    on_success_callback=remove_run_files,
 )
 
-# Base command setup for all tasks
-base_cmd = f'cd {PROJECT_ROOT} && source .venv/bin/activate && export PYTHONPATH={PROJECT_ROOT}'
-
-# Task 1: Fetch monsters using task function
-fetch_monsters = BashOperator(
+# Task 1: Fetch ALL monsters (no limit) for better random selection
+fetch_monsters = PythonOperator(
     task_id='fetch_monsters',
-    bash_command=f'''{base_cmd} && python -c "
-from src.pipeline.transformation.tasks import fetch_monsters_task
-import json
-print('🔄 Fetching ALL monsters from D&D API...')
-result = fetch_monsters_task()  # Remove limit to fetch all monsters
-print(f'✅ Task completed: Fetched {{len(result)}} monsters')
-with open('/tmp/monsters_list.json', 'w') as f:
-    json.dump(result, f)
-"''',
+    python_callable=fetch_monsters_task,
     dag=dag,
 )
 
-# Task 2: Select random monsters using task function
-select_random_monsters = BashOperator(
+# Task 2: Select random monsters from the fetch_monsters XCom
+select_random_monsters = PythonOperator(
     task_id='select_random_monsters',
-    bash_command=f'''{base_cmd} && python -c "
-from src.pipeline.transformation.tasks import select_random_monsters_task
-import json
-print('🔄 Selecting random monsters...')
-with open('/tmp/monsters_list.json', 'r') as f:
-    monsters_data = json.load(f)
-class MockTI:
-    def xcom_pull(self, task_ids=None): return monsters_data
-result = select_random_monsters_task(ti=MockTI(), count=5)
-print(f'✅ Task completed: Selected {{len(result)}} random monsters')
-with open('/tmp/selected_monsters.json', 'w') as f:
-    json.dump(result, f)
-"''',
+    python_callable=select_random_monsters_task,
+    op_kwargs={'count': 5},
     dag=dag,
 )
 
-# Task 3: Fetch monster details using task function
-fetch_monster_details = BashOperator(
+# Task 3: Fetch detailed data for the selected monsters
+fetch_monster_details = PythonOperator(
     task_id='fetch_monster_details',
-    bash_command=f'''{base_cmd} && python -c "
-from src.pipeline.transformation.tasks import fetch_monster_details_task
-import json
-print('🔄 Fetching detailed monster data...')
-with open('/tmp/selected_monsters.json', 'r') as f:
-    selected_data = json.load(f)
-class MockTI:
-    def xcom_pull(self, task_ids=None): return selected_data
-result = fetch_monster_details_task(ti=MockTI())
-print(f'✅ Task completed: Processed {{len(result)}} monsters with full details')
-with open('/tmp/detailed_monsters.json', 'w') as f:
-    json.dump(result, f)
-"''',
+    python_callable=fetch_monster_details_task,
     dag=dag,
 )
 
-# Task 4: Save monsters using task function
-save_monsters = BashOperator(
+# Task 4: Save monsters to JSON in the project root
+save_monsters = PythonOperator(
     task_id='save_monsters',
-    bash_command=f'''{base_cmd} && python -c "
-from src.pipeline.transformation.tasks import save_monsters_task
-import json, os
-print('🔄 Saving monsters to JSON file...')
-with open('/tmp/detailed_monsters.json', 'r') as f:
-    detailed_data = json.load(f)
-class MockTI:
-    def xcom_pull(self, task_ids=None): return detailed_data
-result = save_monsters_task(ti=MockTI(), output_file='monsters.json')
-print(f'✅ Pipeline completed successfully: {{result}}')
-# Cleanup
-for f in ['/tmp/monsters_list.json', '/tmp/selected_monsters.json', '/tmp/detailed_monsters.json']:
-    try: os.remove(f)
-    except: pass
-"''',
+    python_callable=save_monsters_task,
+    op_kwargs={'output_file': os.path.join(PROJECT_ROOT, 'monsters.json')},
     dag=dag,
 )
 
@@ -10,13 +10,7 @@ import sys
 import logging
 from pathlib import Path
 
-# Import task functions (elimina redundância)
-from src.pipeline.transformation.tasks import (
-    fetch_monsters_task,
-    select_random_monsters_task, 
-    fetch_monster_details_task,
-    save_monsters_task
-)
+from src.pipeline.transformation import DnDAPIClient
 
 # Configure logging
 logging.basicConfig(
@@ -26,11 +20,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
 def main():
-    """Main entrypoint for direct pipeline execution using task functions."""
+    """Main entrypoint for direct pipeline execution calling the API client."""
     logger.info("D&D Monster Pipeline - Direct Execution")
     logger.info("=" * 50)
-    logger.info("Using same task functions as Airflow DAG")
+    logger.info("Calling DnDAPIClient directly (no XCom round-trips)")
     logger.info("=" * 50)
     
     # Check if output already exists (idempotency)
@@ -43,27 +38,23 @@ def main():
         return 0
     
     try:
-        # Step 1: Fetch ALL monsters using task function 
-        monsters_data = fetch_monsters_task()  
+        client = DnDAPIClient()
+        
+        # Step 1: Fetch ALL monsters
+        monsters = client.fetch_monsters_list()
         
-        # Step 2: Select random monsters using task function
-        class MockTI:
-            def xcom_pull(self, task_ids=None): return monsters_data
-        selected_data = select_random_monsters_task(ti=MockTI(), count=5)
+        # Step 2: Select random monsters
+        selected = client.select_random_monsters(monsters, 5)
         
-        # Step 3: Fetch detailed data using task function
-        class MockTI2:
-            def xcom_pull(self, task_ids=None): return selected_data
-        detailed_data = fetch_monster_details_task(ti=MockTI2())
+        # Step 3: Fetch detailed data concurrently
+        detailed = client.fetch_and_process_many([m.url for m in selected])
         
-        # Step 4: Save to JSON using task function
-        class MockTI3:
-            def xcom_pull(self, task_ids=None): return detailed_data
-        saved_file = save_monsters_task(ti=MockTI3(), output_file='monsters.json')
+        # Step 4: Save to JSON
+        saved_file = client.save_monsters_to_json(detailed, 'monsters.json')
         
         # Success summary
         logger.info(f"\n Challenge completed successfully!")
-        logger.info(f"Generated {len(detailed_data)} monsters in {saved_file}")
+        logger.info(f"Generated {len(detailed)} monsters in {saved_file}")
         return 0
         
     except Exception as e:
@@ -18,6 +18,8 @@ echo "📝 Setting up environment variables..."
 export AIRFLOW_HOME=$(pwd)/airflow_home
 export AIRFLOW__CORE__DAGS_FOLDER=$(pwd)/dags
 export AIRFLOW__CORE__LOAD_EXAMPLES=False
+export PYTHONPATH=$(pwd)
+export AIRFLOW__CORE__XCOM_BACKEND=src.pipeline.xcom_backend.MsgpackXCom
 
 # Step 3: Activate virtual environment
 echo "🔄 Activating virtual environment..."
@@ -1,6 +1,6 @@
 # dnddata.transformation package
 from .api_client import DnDAPIClient
-from .models import Monster, MonsterSummary, APIResponse, Action
+from .models import Monster, MonsterSummary, Action
 from .tasks import (
     fetch_monsters_task,
     select_random_monsters_task,
@@ -12,7 +12,6 @@ __all__ = [
     'DnDAPIClient',
     'Monster',
     'MonsterSummary', 
-    'APIResponse',
     'Action',
     'fetch_monsters_task',
     'select_random_monsters_task',
@@ -1,72 +1,199 @@
-import json
+import re
 import random
 import logging
+import orjson
 import requests
-from typing import List, Dict, Any
+import requests_cache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union
 from pathlib import Path
+from pydantic import TypeAdapter
 
-from .models import Monster, MonsterSummary, APIResponse, Action
+from .models import Monster, MonsterSummary
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Reusable adapters, built once instead of per call
+_SUMMARY_LIST = TypeAdapter(List[MonsterSummary])
+_MONSTERS_ADAPTER = TypeAdapter(List[Monster])
+
+
+def _dumps_array_item(data: Dict[str, Any]) -> bytes:
+    """Serialize one array element indented as if nested in a top-level list."""
+    # JSON strings never contain raw newlines, so re-indenting lines is safe
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  ")
+
+
+def _extract_armor_class(armor_class: Any) -> Optional[int]:
+    """Extract armor_class value from API data, None if null/missing."""
+    if not armor_class:
+        return None
+    if isinstance(armor_class, list):
+        # Extract value from list format, keep None if missing
+        return armor_class[0].get('value')
+    if isinstance(armor_class, int):
+        return armor_class
+    return None
+
 
 class DnDAPIClient:
     """Client for interaction with the D&D 5e API."""
     
     BASE_URL = "https://www.dnd5eapi.co/api/2014"
+    # Only these detail fields are read by process_monster_data
+    DETAIL_FIELDS = ('name', 'hit_points', 'armor_class', 'actions')
+    # Detail fetches are network-bound, so threads overlap the round-trips
+    MAX_DETAIL_WORKERS = 16
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, cache_name: str = ".dnd_cache"):
+        # Cache GET responses on disk so reruns after a partial failure skip the network.
+        # Expired entries with an ETag/Last-Modified are revalidated with a conditional
+        # GET, so an unchanged monsters index comes back as a bodiless 304
+        self.session = requests_cache.CachedSession(
+            cache_name=cache_name,
+            backend='sqlite',
+            expire_after=timedelta(days=7),
+            # The monsters index is the largest payload; refresh it daily, details weekly
+            urls_expire_after={
+                re.compile(rf"^{re.escape(self.BASE_URL)}/monsters$"): timedelta(days=1)
+            },
+            allowable_methods=['GET'],
+            # Fall back to an expired cached response if the API is unavailable
+            stale_if_error=True
+        )
+        # Keep-alive pool sized for parallel detail fetches, with retry/backoff
+        # on throttling and transient server errors handled at transport level
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=6,
+                backoff_factor=0.5,
+                backoff_jitter=0.25,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True
+            )
+        )
+        self.session.mount("https://", adapter)
         self.session.headers.update({
-            'User-Agent': 'DnD-Monster-Pipeline/1.0'
+            'User-Agent': 'DnD-Monster-Pipeline/1.0',
+            # Every encoding urllib3 can decode here (gzip, plus br with Brotli installed)
+            'Accept-Encoding': ACCEPT_ENCODING
         })
         # Set timeouts for all requests
         self.timeout = 30
     
-    def fetch_monsters_list(self, limit: int = None) -> List[MonsterSummary]:
-        """
-        Fetch monsters from API 
-        """
+    def _fetch_monsters_results(self) -> List[Dict[str, Any]]:
+        """Fetch the monsters index from the API and return its raw results list."""
         url = f"{self.BASE_URL}/monsters"
         
         try:
             logger.info(f"Fetching monsters from: {url}")
             response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
-            
-            api_response = APIResponse(**response.json())
-            
-            # Apply limit if specified
-            if limit is not None:
-                limited_results = api_response.results[:limit]
-                logger.info(f"Limited to first {len(limited_results)} monsters from total {len(api_response.results)} available")
-                return limited_results
-            else:
-                logger.info(f"Fetched all {len(api_response.results)} monsters from API")
-                return api_response.results
-            
-        except requests.RequestException as e:
+            # A non-JSON body (e.g. a maintenance page) or missing results is a failed fetch
+            results = orjson.loads(response.content)['results']
+            if not isinstance(results, list):
+                raise TypeError(f"'results' is {type(results).__name__}, expected a list")
+            return results
+        except (requests.RequestException, orjson.JSONDecodeError, KeyError, TypeError) as e:
             logger.error(f"Failed to fetch monsters list: {e}")
             raise Exception(f"Failed to fetch monsters list: {e}")
     
-    def fetch_monster_details(self, monster_url: str) -> Dict[str, Any]:
-        """Fetch detailed information for a specific monster."""
+    def _apply_limit(self, results: List[Any], limit: int = None) -> List[Any]:
+        """Apply limit to fetched monsters if specified."""
+        if limit is not None:
+            limited_results = results[:limit]
+            logger.info(f"Limited to first {len(limited_results)} monsters from total {len(results)} available")
+            return limited_results
+        
+        logger.info(f"Fetched all {len(results)} monsters from API")
+        return results
+    
+    def fetch_monsters_list(self, limit: int = None) -> List[MonsterSummary]:
+        """
+        Fetch monsters from API 
+        """
+        # The count field is never used, so validate only the (limited) results list
+        return _SUMMARY_LIST.validate_python(self._apply_limit(self._fetch_monsters_results(), limit))
+    
+    def fetch_monsters_data(self, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Fetch monsters from API as raw dicts, skipping model validation.
+        """
+        return self._apply_limit(self._fetch_monsters_results(), limit)
+    
+    @staticmethod
+    def _full_url(monster_url: str) -> str:
+        """Absolute URL for a monster detail link."""
         # If URL is relative, add base URL
         if monster_url.startswith('/'):
-            full_url = f"https://www.dnd5eapi.co{monster_url}"
-        else:
-            full_url = monster_url
+            return f"https://www.dnd5eapi.co{monster_url}"
+        return monster_url
+    
+    def _get_monster_details(self, monster_url: str) -> Dict[str, Any]:
+        """GET one monster's detail fields, raising whatever goes wrong unwrapped and unlogged."""
+        full_url = self._full_url(monster_url)
+        logger.info(f"Fetching details from: {full_url}")
+        response = self.session.get(full_url, timeout=self.timeout)
+        response.raise_for_status()
+        raw_data = orjson.loads(response.content)
+        # Drop senses, proficiencies, legendary actions etc. right after parsing
+        return {key: raw_data[key] for key in self.DETAIL_FIELDS if key in raw_data}
+    
+    def fetch_monster_details(self, monster_url: str) -> Dict[str, Any]:
+        """Fetch the detail fields the pipeline uses for a specific monster."""
+        full_url = self._full_url(monster_url)
         
         try:
-            logger.info(f"Fetching details from: {full_url}")
-            response = self.session.get(full_url, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            return self._get_monster_details(full_url)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             logger.error(f"Failed to fetch monster details from {full_url}: {e}")
             raise Exception(f"Failed to fetch monster details from {full_url}: {e}")
     
+    def fetch_monster_details_many(self, monster_urls: List[str]) -> Iterator[Union[Dict[str, Any], Exception]]:
+        """
+        Fetch details for several monsters concurrently over the pooled session.
+        Yields in monster_urls order as soon as each fetch is done; a failed fetch
+        yields its exception instead, so the caller can log or skip it.
+        """
+        if not monster_urls:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(self.MAX_DETAIL_WORKERS, len(monster_urls))) as executor:
+            futures = [executor.submit(self._get_monster_details, monster_url) for monster_url in monster_urls]
+            for future in futures:
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield e
+    
+    def fetch_and_process_many(self, monster_urls: List[str]) -> List[Monster]:
+        """
+        Fetch and process several monsters, skipping any whose fetch or processing fails.
+        Each monster is processed while the remaining fetches are still in flight.
+        """
+        monsters = []
+        for monster_url, result in zip(monster_urls, self.fetch_monster_details_many(monster_urls)):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to fetch details for {monster_url}: {result}")
+                continue
+            try:
+                monster = self.process_monster_data(result)
+            except Exception as e:
+                logger.error(f"Failed to process {monster_url}: {e}")
+                continue
+            monsters.append(monster)
+            logger.info(f"Processed {monster.name} - HP: {monster.hit_points}")
+        
+        return monsters
+    
     def select_random_monsters(self, monsters: List[MonsterSummary], count: int = 5) -> List[MonsterSummary]:
         """
         Select random monsters from the list.
@@ -80,52 +207,67 @@ class DnDAPIClient:
         logger.info(f"Selected monsters: {[m.name for m in selected]}")
         return selected
     
+    def select_random_dicts(self, monsters: List[Dict[str, Any]], count: int = 5) -> List[Dict[str, Any]]:
+        """
+        Select random monsters from a list of raw monster dicts.
+        """
+        if len(monsters) < count:
+            logger.warning(f"Requested {count} monsters but only {len(monsters)} available. Using all available.")
+            return monsters
+        
+        logger.info(f"Selecting {count} random monsters from {len(monsters)} available monsters")
+        # Sample positions instead of items so the work is O(count), independent of list size
+        indices = random.sample(range(len(monsters)), count)
+        selected = [monsters[i] for i in indices]
+        logger.info(f"Selected monsters: {[m['name'] for m in selected]}")
+        return selected
+    
     def process_monster_data(self, raw_data: Dict[str, Any]) -> Monster:
         """Process raw monster data."""
         try:
-            # Process actions - only name and desc as per challenge
-            actions = []
-            if 'actions' in raw_data and raw_data['actions']:
-                for action_data in raw_data['actions']:
-                    action = Action(
-                        name=action_data.get('name', ''),
-                        desc=action_data.get('desc', '')
-                    )
-                    actions.append(action)
-            
-            # Extract armor_class from API data - if null/missing, keep as None
-            armor_class = None  # Start with None
-            if 'armor_class' in raw_data and raw_data['armor_class']:
-                if isinstance(raw_data['armor_class'], list) and raw_data['armor_class']:
-                    # Extract value from list format, keep None if missing
-                    armor_class = raw_data['armor_class'][0].get('value')
-                elif isinstance(raw_data['armor_class'], int):
-                    armor_class = raw_data['armor_class']
+            # Actions as plain dicts - only name and desc as per challenge
+            actions = [
+                {'name': action_data.get('name', ''), 'desc': action_data.get('desc', '')}
+                for action_data in raw_data.get('actions') or []
+            ]
             
-            # Extract hit_points from API data - if null/missing, keep as None
-            hit_points = raw_data.get('hit_points')  # Preserve None if missing
-            
-            # Create monster
-            monster = Monster(
+            # One Monster(...) call validates the whole structure, actions included.
+            # hit_points/armor_class stay None if null/missing in the API
+            return Monster(
                 name=raw_data.get('name', ''),
-                hit_points=hit_points,
-                armor_class=armor_class,
+                hit_points=raw_data.get('hit_points'),
+                armor_class=_extract_armor_class(raw_data.get('armor_class')),
                 actions=actions
             )
-            
-            return monster
         except Exception as e:
             raise Exception(f"Failed to process monster data: {e}")
     
     def save_monsters_to_json(self, monsters: List[Monster], filename: str = "monsters.json"):
         """Save monsters data to JSON file."""
         try:
-            data = [monster.model_dump() for monster in monsters]
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Serialize the whole list in one pydantic-core call, no intermediate dicts
+            with open(filename, 'wb') as f:
+                f.write(_MONSTERS_ADAPTER.dump_json(monsters, indent=2))
             
             logger.info(f"Successfully saved {len(monsters)} monsters to {filename}")
             return filename
         except Exception as e:
             raise Exception(f"Failed to save monsters to JSON: {e}")
+    
+    def save_monsters_dicts_to_json(self, monsters: Iterable[Dict[str, Any]], filename: str = "monsters.json"):
+        """Save already-serialized monster dicts (e.g. from XCom) to JSON file."""
+        try:
+            count = 0
+            # orjson writes UTF-8 bytes directly, non-ASCII is kept as-is
+            with open(filename, 'wb') as f:
+                f.write(b"[")
+                for monster in monsters:
+                    f.write(b",\n  " if count else b"\n  ")
+                    f.write(_dumps_array_item(monster))
+                    count += 1
+                f.write(b"\n]" if count else b"]")
+            
+            logger.info(f"Successfully saved {count} monsters to {filename}")
+            return filename
+        except Exception as e:
+            raise Exception(f"Failed to save monsters to JSON: {e}")
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -20,14 +21,11 @@ class Monster(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
 
-class MonsterSummary(BaseModel):
+# Plain slotted dataclass: list entries are simple strings, checked by the
+# client's TypeAdapter(List[MonsterSummary]) when the index is fetched
+@dataclass(slots=True, frozen=True)
+class MonsterSummary:
     """Model for API monster list response."""
     index: str
     name: str
     url: str
-
-
-class APIResponse(BaseModel):
-    """Model for API response."""
-    count: int
-    results: List[MonsterSummary]
@@ -3,15 +3,27 @@ Task functions for the D&D Monster Pipeline.
 """
 
 import logging
+from functools import lru_cache
 from typing import List, Dict, Any
+from pydantic import TypeAdapter
 from .api_client import DnDAPIClient
-from .models import Monster, MonsterSummary
+from .models import Monster
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
-# Create a single client instance to avoid redundancy
-_client = DnDAPIClient()
+
+@lru_cache(maxsize=1)
+def _get_client() -> DnDAPIClient:
+    """
+    Shared client, created on first use so importing this module stays cheap
+    and repeated task runs in one worker reuse the same session.
+    """
+    return DnDAPIClient()
+
+
+# Validate/serialize whole monster lists in a single pydantic-core call
+_MONSTER_LIST = TypeAdapter(List[Monster])
 
 
 def fetch_monsters_task(**context) -> List[Dict[str, Any]]:
@@ -22,12 +34,12 @@ def fetch_monsters_task(**context) -> List[Dict[str, Any]]:
     # Get limit from op_kwargs or context, default to None (fetch all)
     limit = context.get('limit', None)
     
-    monsters_list = _client.fetch_monsters_list(limit=limit)
+    # Raw dicts are already XCom-ready, no need to validate and dump them
+    monsters_data = _get_client().fetch_monsters_data(limit=limit)
     
-    logger.info(f"Fetched {len(monsters_list)} monsters from D&D API")
+    logger.info(f"Fetched {len(monsters_data)} monsters from D&D API")
     
-    # Return serialized data for XCom
-    return [monster.model_dump() for monster in monsters_list]
+    return monsters_data
 
 
 def select_random_monsters_task(**context) -> List[Dict[str, Any]]:
@@ -44,17 +56,13 @@ def select_random_monsters_task(**context) -> List[Dict[str, Any]]:
     if not monsters_data:
         raise ValueError("No monster data received from fetch_monsters task")
     
-    # Convert back to MonsterSummary objects
-    monsters_list = [MonsterSummary(**monster) for monster in monsters_data]
+    # Select random monsters directly from the XCom dicts
+    selected_monsters = _get_client().select_random_dicts(monsters_data, count)
     
-    # Select random monsters
-    selected_monsters = _client.select_random_monsters(monsters_list, count)
-    
-    monster_names = [monster.name for monster in selected_monsters]
+    monster_names = [monster['name'] for monster in selected_monsters]
     logger.info(f"Selected {len(selected_monsters)} random monsters: {', '.join(monster_names)}")
     
-    # Return serialized data for XCom
-    return [monster.model_dump() for monster in selected_monsters]
+    return selected_monsters
 
 
 def fetch_monster_details_task(**context) -> List[Dict[str, Any]]:
@@ -68,26 +76,15 @@ def fetch_monster_details_task(**context) -> List[Dict[str, Any]]:
     if not selected_monsters_data:
         raise ValueError("No selected monsters data received from select_random_monsters task")
     
-    # Convert back to MonsterSummary objects
-    selected_monsters = [MonsterSummary(**monster) for monster in selected_monsters_data]
-    
-    detailed_monsters = []
-    
-    for monster_summary in selected_monsters:
-        try:
-            logger.info(f"Fetching details for: {monster_summary.name}")
-            raw_data = _client.fetch_monster_details(monster_summary.url)
-            monster = _client.process_monster_data(raw_data)
-            detailed_monsters.append(monster)
-            logger.info(f"Processed {monster.name} - HP: {monster.hit_points}")
-        except Exception as e:
-            logger.error(f"Failed to process {monster_summary.name}: {e}")
-            continue
+    # Fetch details concurrently (network-bound), processing each one as it arrives
+    detailed_monsters = _get_client().fetch_and_process_many(
+        [monster_summary['url'] for monster_summary in selected_monsters_data]
+    )
     
     logger.info(f"Successfully processed {len(detailed_monsters)} monsters")
     
     # Return serialized data for XCom
-    return [monster.model_dump() for monster in detailed_monsters]
+    return _MONSTER_LIST.dump_python(detailed_monsters)
 
 
 def save_monsters_task(**context) -> str:
@@ -104,10 +101,7 @@ def save_monsters_task(**context) -> str:
     if not monsters_data:
         raise ValueError("No monster data received from fetch_monster_details task")
     
-    # Convert back to Monster objects
-    monsters = [Monster(**monster) for monster in monsters_data]
-    
-    # Save to file
-    saved_file = _client.save_monsters_to_json(monsters, output_file)
+    # XCom dicts were dumped from validated Monsters, write them as-is
+    saved_file = _get_client().save_monsters_dicts_to_json(monsters_data, output_file)
     
     return saved_file
@@ -0,0 +1,97 @@
+"""
+Airflow XCom backend for the D&D Monster Pipeline.
+"""
+
+import os
+import uuid
+import shutil
+import logging
+from typing import Any, Optional
+
+import msgpack
+from airflow.models.xcom import BaseXCom
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Large payloads go to tmpfs, only their path is stored in the metadata DB
+XCOM_DIR = os.environ.get('DND_XCOM_DIR', '/dev/shm/dnd_xcom')
+INLINE_LIMIT = 1024
+
+# One-byte tags telling inline msgpack payloads from file references
+_INLINE = b'I'
+_REFERENCE = b'R'
+
+
+class MsgpackXCom(BaseXCom):
+    """XCom backend storing values as msgpack instead of JSON."""
+    
+    @staticmethod
+    def serialize_value(
+        value: Any,
+        *,
+        key: Optional[str] = None,
+        task_id: Optional[str] = None,
+        dag_id: Optional[str] = None,
+        run_id: Optional[str] = None,
+        map_index: Optional[int] = None,
+        **kwargs
+    ) -> bytes:
+        """Pack value with msgpack, spilling large payloads to a tmpfs file."""
+        packed = msgpack.packb(value, use_bin_type=True)
+        if len(packed) <= INLINE_LIMIT:
+            return _INLINE + packed
+        
+        # Group files per DAG run so remove_run_files can drop them in one go. Names are
+        # fixed per XCom so an xcom_push overwrite (which Airflow does without purge)
+        # replaces the old file instead of orphaning it
+        if dag_id and run_id and task_id:
+            directory = os.path.join(XCOM_DIR, dag_id, run_id)
+            filename = f"{task_id}.{map_index if map_index is not None else -1}.{key}.msgpack"
+        else:
+            directory = XCOM_DIR
+            filename = f"{uuid.uuid4().hex}.msgpack"
+        
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, filename)
+        with open(path, 'wb') as f:
+            f.write(packed)
+        
+        logger.info(f"Stored {len(packed)} byte XCom payload in {path}")
+        return _REFERENCE + path.encode('utf-8')
+    
+    @staticmethod
+    def deserialize_value(result) -> Any:
+        """Unpack an XCom value written by serialize_value."""
+        value = result.value
+        tag, payload = value[:1], value[1:]
+        
+        if tag == _REFERENCE:
+            with open(payload.decode('utf-8'), 'rb') as f:
+                payload = f.read()
+        
+        return msgpack.unpackb(payload, raw=False)
+    
+    @staticmethod
+    def purge(xcom, session) -> None:
+        """Delete the spilled file when Airflow clears the XCom (e.g. before a task (re)runs)."""
+        value = xcom.value
+        if value and value[:1] == _REFERENCE:
+            try:
+                os.remove(value[1:].decode('utf-8'))
+            except FileNotFoundError:
+                pass
+    
+    def orm_deserialize_value(self) -> Any:
+        """Value shown in the Airflow UI, without reading spilled files."""
+        if self.value[:1] == _REFERENCE:
+            return f"msgpack XCom stored in {self.value[1:].decode('utf-8')}"
+        return self.deserialize_value(self)
+
+
+def remove_run_files(context) -> None:
+    """DAG callback removing every payload a finished run spilled to XCOM_DIR."""
+    dag_run = context['dag_run']
+    directory = os.path.join(XCOM_DIR, dag_run.dag_id, dag_run.run_id)
+    shutil.rmtree(directory, ignore_errors=True)
+    logger.info(f"Removed spilled XCom payloads in {directory}")
@@ -3,34 +3,69 @@ Unit tests for API client functionality.
 """
 
 import pytest
-import json
+import orjson
+import logging
+import sqlite3
 from unittest.mock import Mock, patch, MagicMock
 import requests
+from datetime import timedelta
+from urllib3 import HTTPResponse
+from pydantic import ValidationError
 
 from src.pipeline.transformation.api_client import DnDAPIClient
 from src.pipeline.transformation.models import Monster, MonsterSummary, Action
 
 
+def _http_response(request, status=200, body=b"", headers=None) -> requests.Response:
+    """Build a real transport-level Response for a patched HTTPAdapter.send."""
+    response = requests.Response()
+    response.status_code = status
+    response.url = request.url
+    response.request = request
+    response.headers.update(headers or {})
+    response._content = body
+    # requests-cache reads the urllib3 response when storing it
+    response.raw = HTTPResponse(body=body, status=status, preload_content=False)
+    return response
+
+
 class TestDnDAPIClient:
     """Test DnDAPIClient functionality."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.client = DnDAPIClient()
+    @pytest.fixture(autouse=True)
+    def setup_client(self, tmp_path):
+        """Set up a client whose response cache lives in the test's tmp_path."""
+        self.client = DnDAPIClient(cache_name=str(tmp_path / "cache"))
+    
+    def test_session_uses_pooled_retry_adapter(self):
+        """Test the session mounts a pooled adapter that retries throttled GETs."""
+        adapter = self.client.session.get_adapter("https://www.dnd5eapi.co/api/2014/monsters")
+        
+        assert adapter._pool_maxsize == 32
+        assert 429 in adapter.max_retries.status_forcelist
+        assert adapter.max_retries.respect_retry_after_header
+        assert adapter.max_retries.backoff_jitter > 0
+        assert self.client.session.settings.stale_if_error
+    
+    def test_session_accepts_compressed_responses(self):
+        """Test the session advertises compressed encodings it can decode."""
+        accept_encoding = self.client.session.headers['Accept-Encoding']
+        
+        assert 'gzip' in accept_encoding
     
-    @patch('src.pipeline.transformation.api_client.requests.Session.get')
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
     def test_fetch_monsters_list_success(self, mock_get):
         """Test successful fetch of monsters list with simple limiting."""
         # Mock API response
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {
+        mock_response.content = orjson.dumps({
             "count": 10,
             "results": [
                 {"index": f"monster{i}", "name": f"Monster {i}", "url": f"/api/monsters/monster{i}"}
                 for i in range(10)
             ]
-        }
+        })
         mock_get.return_value = mock_response
         
         # Execute with limit parameter
@@ -44,7 +79,59 @@ class TestDnDAPIClient:
         # Verify API was called once
         mock_get.assert_called_once()
     
-    @patch('src.pipeline.transformation.api_client.requests.Session.get')
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_fetch_monsters_list_invalid_payload(self, mock_get):
+        """Test malformed list entries are rejected by validation."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.content = orjson.dumps({
+            "count": 1,
+            "results": [{"index": "goblin", "name": "Goblin"}]  # Missing url
+        })
+        mock_get.return_value = mock_response
+        
+        with pytest.raises(ValidationError):
+            self.client.fetch_monsters_list()
+    
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_fetch_monsters_list_validates_only_limited_results(self, mock_get):
+        """Test entries beyond the limit are not validated."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.content = orjson.dumps({
+            "count": 2,
+            "results": [
+                {"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"},
+                {"index": "skeleton", "name": "Skeleton"}  # Missing url, past the limit
+            ]
+        })
+        mock_get.return_value = mock_response
+        
+        result = self.client.fetch_monsters_list(limit=1)
+        
+        assert result == [MonsterSummary(index="goblin", name="Goblin", url="/api/monsters/goblin")]
+    
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_fetch_monsters_data_returns_raw_dicts(self, mock_get):
+        """Test fetching monsters as raw dicts with limiting."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.content = orjson.dumps({
+            "count": 10,
+            "results": [
+                {"index": f"monster{i}", "name": f"Monster {i}", "url": f"/api/monsters/monster{i}"}
+                for i in range(10)
+            ]
+        })
+        mock_get.return_value = mock_response
+        
+        monsters = self.client.fetch_monsters_data(limit=3)
+        
+        assert len(monsters) == 3
+        assert monsters[0] == {"index": "monster0", "name": "Monster 0", "url": "/api/monsters/monster0"}
+        mock_get.assert_called_once()
+    
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
     def test_fetch_monsters_list_api_error(self, mock_get):
         """Test fetch monsters list with API error."""
         # Mock API error
@@ -56,13 +143,35 @@ class TestDnDAPIClient:
         
         assert "Failed to fetch monsters list" in str(exc_info.value)
     
-    @patch('src.pipeline.transformation.api_client.requests.Session.get')
+    @pytest.mark.parametrize("body", [
+        b"<html>Down for maintenance</html>",
+        b'{"count": 0}',
+        b'[]',
+        b'{"results": null}',
+        b'{"results": {}}',
+        b'{"results": "abc"}'
+    ])
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_fetch_monsters_malformed_index(self, mock_get, body):
+        """Test a non-JSON or results-less index body is wrapped like other fetch errors."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.content = body
+        mock_get.return_value = mock_response
+        
+        for fetch in (self.client.fetch_monsters_list, self.client.fetch_monsters_data):
+            with pytest.raises(Exception) as exc_info:
+                fetch()
+            
+            assert "Failed to fetch monsters list" in str(exc_info.value)
+    
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
     def test_fetch_monster_details_success(self, mock_get):
         """Test successful fetch of monster details."""
         # Mock API response
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {
+        mock_response.content = orjson.dumps({
             "name": "Goblin",
             "hit_points": 15,
             "armor_class": [{"type": "natural", "value": 12}],
@@ -72,7 +181,7 @@ class TestDnDAPIClient:
                     "desc": "Melee Weapon Attack: +4 to hit, reach 5 ft., one target."
                 }
             ]
-        }
+        })
         mock_get.return_value = mock_response
         
         # Execute
@@ -84,6 +193,143 @@ class TestDnDAPIClient:
         assert len(details["actions"]) == 1
         mock_get.assert_called_once()
     
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_fetch_monster_details_skips_unused_fields(self, mock_get):
+        """Test only the fields used by the pipeline are returned."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.content = orjson.dumps({
+            "index": "goblin",
+            "name": "Goblin",
+            "hit_points": 7,
+            "armor_class": [{"type": "armor", "value": 15}],
+            "senses": {"darkvision": "60 ft."},
+            "actions": [{"name": "Scimitar", "desc": "Melee attack", "attack_bonus": 4}]
+        })
+        mock_get.return_value = mock_response
+        
+        details = self.client.fetch_monster_details("/api/monsters/goblin")
+        
+        assert details == {
+            "name": "Goblin",
+            "hit_points": 7,
+            "armor_class": [{"type": "armor", "value": 15}],
+            "actions": [{"name": "Scimitar", "desc": "Melee attack", "attack_bonus": 4}]
+        }
+    
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_fetch_monster_details_many(self, mock_get):
+        """Test batched detail fetches keep input order and yield failures as exceptions."""
+        def get(url, **kwargs):
+            if url.endswith("/skeleton"):
+                raise requests.ConnectionError("Network error")
+            mock_response = Mock()
+            mock_response.raise_for_status.return_value = None
+            mock_response.content = orjson.dumps({"name": url.rsplit("/", 1)[-1]})
+            return mock_response
+        mock_get.side_effect = get
+        
+        details = self.client.fetch_monster_details_many(
+            ["/api/monsters/goblin", "/api/monsters/skeleton", "/api/monsters/dragon"]
+        )
+        
+        goblin, skeleton, dragon = details
+        assert goblin == {"name": "goblin"}
+        assert isinstance(skeleton, requests.ConnectionError)
+        assert dragon == {"name": "dragon"}
+        assert list(self.client.fetch_monster_details_many([])) == []
+    
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_fetch_and_process_many_skips_failures(self, mock_get):
+        """Test failed fetches and unprocessable details are skipped, order kept."""
+        payloads = {
+            "goblin": {"name": "Goblin", "hit_points": 7},
+            "dragon": {"name": "Dragon", "hit_points": "lots"},  # Fails validation
+            "ghost": {"name": "Ghost", "hit_points": 45}
+        }
+        
+        def get(url, **kwargs):
+            key = url.rsplit("/", 1)[-1]
+            if key not in payloads:
+                raise requests.ConnectionError("Network error")
+            mock_response = Mock()
+            mock_response.raise_for_status.return_value = None
+            mock_response.content = orjson.dumps(payloads[key])
+            return mock_response
+        mock_get.side_effect = get
+        
+        monsters = self.client.fetch_and_process_many([
+            "/api/monsters/goblin", "/api/monsters/skeleton", "/api/monsters/dragon", "/api/monsters/ghost"
+        ])
+        
+        assert [m.name for m in monsters] == ["Goblin", "Ghost"]
+        assert self.client.fetch_and_process_many([]) == []
+    
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_fetch_and_process_many_logs_each_failure_once(self, mock_get, caplog):
+        """Test every failed fetch is logged exactly once with its URL and cause."""
+        def get(url, **kwargs):
+            if url.endswith("/skeleton"):
+                raise requests.ConnectionError("Network error")
+            raise sqlite3.OperationalError("database is locked")
+        mock_get.side_effect = get
+        
+        with caplog.at_level(logging.ERROR):
+            monsters = self.client.fetch_and_process_many(["/api/monsters/skeleton", "/api/monsters/ghost", None])
+        
+        assert monsters == []
+        errors = [record.getMessage() for record in caplog.records if record.levelno == logging.ERROR]
+        assert len(errors) == 3
+        assert "/api/monsters/skeleton: Network error" in errors[0]
+        assert "/api/monsters/ghost: database is locked" in errors[1]
+        assert errors[2].startswith("Failed to fetch details for None: ")
+    
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_fetch_monster_details_cached(self, mock_send):
+        """Test repeated detail fetches are served from the response cache."""
+        mock_send.side_effect = lambda request, **kwargs: _http_response(
+            request, body=orjson.dumps({"name": "Goblin", "hit_points": 7})
+        )
+        
+        first = self.client.fetch_monster_details("/api/monsters/goblin")
+        second = self.client.fetch_monster_details("/api/monsters/goblin")
+        
+        assert first == second == {"name": "Goblin", "hit_points": 7}
+        mock_send.assert_called_once()
+    
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_monsters_list_cached_for_one_day(self, mock_send):
+        """Test the monsters index expires after a day while details keep a week."""
+        mock_send.side_effect = lambda request, **kwargs: _http_response(
+            request, body=orjson.dumps({"count": 0, "results": []})
+        )
+        
+        self.client.fetch_monsters_data()
+        self.client.fetch_monster_details("/api/2014/monsters/goblin")
+        
+        expires = {r.url.rsplit('/', 1)[-1]: r.expires for r in self.client.session.cache.responses.values()}
+        assert expires["goblin"] - expires["monsters"] > timedelta(days=5)
+    
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_fetch_monsters_list_revalidates_with_etag(self, mock_send):
+        """Test an expired monsters list is revalidated and reused on 304."""
+        def send(request, **kwargs):
+            if request.headers.get('If-None-Match') == '"v1"':
+                return _http_response(request, status=304, headers={'ETag': '"v1"'})
+            return _http_response(request, body=orjson.dumps({
+                "count": 1,
+                "results": [{"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"}]
+            }), headers={'ETag': '"v1"'})
+        mock_send.side_effect = send
+        
+        first = self.client.fetch_monsters_data()
+        self.client.session.cache.reset_expiration(0)
+        second = self.client.fetch_monsters_data()
+        
+        assert first == second == [{"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"}]
+        assert mock_send.call_count == 2
+        assert mock_send.call_args[0][0].headers['If-None-Match'] == '"v1"'
+    
     def test_select_random_monsters_success(self):
         """Test successful random monster selection."""
         # Create test monsters
@@ -116,6 +362,27 @@ class TestDnDAPIClient:
         assert len(selected) == 1
         assert selected[0].name == "Monster 1"
     
+    def test_select_random_dicts_success(self):
+        """Test random selection on raw monster dicts."""
+        monsters = [
+            {"index": f"monster{i}", "name": f"Monster {i}", "url": f"/api/monsters/monster{i}"}
+            for i in range(10)
+        ]
+        
+        selected = self.client.select_random_dicts(monsters, 3)
+        
+        assert len(selected) == 3
+        assert all(monster in monsters for monster in selected)
+        assert len({monster["name"] for monster in selected}) == 3
+    
+    def test_select_random_dicts_not_enough(self):
+        """Test raw dict selection returns all available when insufficient."""
+        monsters = [{"index": "monster1", "name": "Monster 1", "url": "/api/monsters/monster1"}]
+        
+        selected = self.client.select_random_dicts(monsters, 5)
+        
+        assert selected == monsters
+    
     def test_process_monster_data_complete(self):
         """Test processing complete monster data."""
         # Mock raw data
@@ -202,8 +469,7 @@ class TestDnDAPIClient:
         assert monster.armor_class == 12
     
     @patch('builtins.open', new_callable=MagicMock)
-    @patch('json.dump')
-    def test_save_monsters_to_json(self, mock_json_dump, mock_open):
+    def test_save_monsters_to_json(self, mock_open):
         """Test saving monsters to JSON file."""
         # Create test monsters
         monsters = [
@@ -216,12 +482,13 @@ class TestDnDAPIClient:
         
         # Verify
         assert result == "test.json"
-        mock_open.assert_called_once_with("test.json", 'w', encoding='utf-8')
-        mock_json_dump.assert_called_once()
+        mock_open.assert_called_once_with("test.json", 'wb')
+        mock_file = mock_open.return_value.__enter__.return_value
         
-        # Verify the data structure passed to json.dump
-        call_args = mock_json_dump.call_args[0]
-        saved_data = call_args[0]
+        # Verify the data structure of the single dump_json write
+        mock_file.write.assert_called_once()
+        written = mock_file.write.call_args[0][0]
+        saved_data = orjson.loads(written)
         assert len(saved_data) == 2
         assert saved_data[0]["name"] == "Goblin"
         assert saved_data[1]["name"] == "Skeleton"
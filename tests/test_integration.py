@@ -3,123 +3,117 @@ Integration tests for the complete pipeline.
 """
 
 import pytest
-import json
-import tempfile
-import os
-from pathlib import Path
-from unittest.mock import patch, Mock
+import orjson
+from types import SimpleNamespace
+from unittest.mock import patch
 
 from src.pipeline.transformation.api_client import DnDAPIClient
 from src.pipeline.transformation.models import Monster, MonsterSummary
 
+# Keys every saved monster record must have
+REQUIRED_FIELDS = frozenset(("name", "hit_points", "armor_class", "actions"))
+
+# Mocked API payloads, built once for the whole module
+_LIST_RESP = {
+    "count": 3,
+    "results": [
+        {"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"},
+        {"index": "skeleton", "name": "Skeleton", "url": "/api/monsters/skeleton"},
+        {"index": "dragon", "name": "Dragon", "url": "/api/monsters/dragon"}
+    ]
+}
+_GOBLIN_RESP = {
+    "name": "Goblin",
+    "hit_points": 15,
+    "armor_class": [{"type": "natural", "value": 12}],
+    "actions": [
+        {"name": "Scimitar", "desc": "Melee attack with scimitar"}
+    ]
+}
+_SKELETON_RESP = {
+    "name": "Skeleton",
+    "hit_points": 13,
+    "armor_class": [{"type": "armor", "value": 13}],
+    "actions": [
+        {"name": "Shortsword", "desc": "Melee attack with shortsword"}
+    ]
+}
+_DRAGON_RESP = {
+    "name": "Dragon",
+    "hit_points": 200,
+    "armor_class": [{"type": "natural", "value": 18}],
+    "actions": [
+        {"name": "Bite", "desc": "Bite attack"},
+        {"name": "Fire Breath", "desc": "Breathes fire"}
+    ]
+}
+
+# Response bodies serialized once, keyed by the last URL segment; anything else gets the list
+_LIST_BYTES = orjson.dumps(_LIST_RESP)
+_BYTES_BY_KEY = {
+    "goblin": orjson.dumps(_GOBLIN_RESP),
+    "skeleton": orjson.dumps(_SKELETON_RESP),
+    "dragon": orjson.dumps(_DRAGON_RESP)
+}
+
+
+def _mock_api_response(url, **kwargs):
+    """Mocked session.get returning the payload matching the requested URL."""
+    # Plain stub with just the attributes the client reads, no Mock bookkeeping
+    return SimpleNamespace(
+        status_code=200,
+        content=_BYTES_BY_KEY.get(url.rsplit("/", 1)[-1], _LIST_BYTES),
+        raise_for_status=lambda: None
+    )
+
 
 class TestPipelineIntegration:
     """Integration tests for the complete pipeline."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.client = DnDAPIClient()
-        self.temp_dir = tempfile.mkdtemp()
-    
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        # Clean up temp files
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def setup_client(cls, tmp_path_factory):
+        """Set up one client (session, adapters) shared by all tests, caching under a tmp dir."""
+        cls.client = DnDAPIClient(cache_name=str(tmp_path_factory.mktemp("cache") / "cache"))
     
-    @patch('src.pipeline.transformation.api_client.requests.Session.get')
-    def test_full_pipeline_flow(self, mock_get):
+    @patch('src.pipeline.transformation.api_client.requests_cache.CachedSession.get')
+    def test_full_pipeline_flow(self, mock_get, tmp_path):
         """Test the complete pipeline flow with mocked API."""
-        # Mock API responses
-        def mock_api_response(url, **kwargs):
-            mock_response = Mock()
-            mock_response.raise_for_status.return_value = None
-            
-            if '/monsters' in url and url.endswith('/monsters'):
-                # Mock monsters list
-                mock_response.json.return_value = {
-                    "count": 3,
-                    "results": [
-                        {"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"},
-                        {"index": "skeleton", "name": "Skeleton", "url": "/api/monsters/skeleton"},
-                        {"index": "dragon", "name": "Dragon", "url": "/api/monsters/dragon"}
-                    ]
-                }
-            elif 'goblin' in url:
-                # Mock goblin details
-                mock_response.json.return_value = {
-                    "name": "Goblin",
-                    "hit_points": 15,
-                    "armor_class": [{"type": "natural", "value": 12}],
-                    "actions": [
-                        {"name": "Scimitar", "desc": "Melee attack with scimitar"}
-                    ]
-                }
-            elif 'skeleton' in url:
-                # Mock skeleton details
-                mock_response.json.return_value = {
-                    "name": "Skeleton",
-                    "hit_points": 13,
-                    "armor_class": [{"type": "armor", "value": 13}],
-                    "actions": [
-                        {"name": "Shortsword", "desc": "Melee attack with shortsword"}
-                    ]
-                }
-            elif 'dragon' in url:
-                # Mock dragon details
-                mock_response.json.return_value = {
-                    "name": "Dragon",
-                    "hit_points": 200,
-                    "armor_class": [{"type": "natural", "value": 18}],
-                    "actions": [
-                        {"name": "Bite", "desc": "Bite attack"},
-                        {"name": "Fire Breath", "desc": "Breathes fire"}
-                    ]
-                }
-            
-            return mock_response
-        
-        mock_get.side_effect = mock_api_response
+        mock_get.side_effect = _mock_api_response
         
         # Execute pipeline steps
         # Step 1: Fetch monsters list with simple limiting
         monsters_list = self.client.fetch_monsters_list(limit=10)  # Get first 10
         assert len(monsters_list) == 3
-        assert all(isinstance(m, MonsterSummary) for m in monsters_list)
+        assert {type(m) for m in monsters_list} == {MonsterSummary}
         
         # Step 2: Select monsters (select all for predictable testing)
         selected_monsters = monsters_list[:2]  # Select first 2
         assert len(selected_monsters) == 2
         
-        # Step 3: Fetch details for selected monsters
-        detailed_monsters = []
-        for monster_summary in selected_monsters:
-            raw_data = self.client.fetch_monster_details(monster_summary.url)
-            monster = self.client.process_monster_data(raw_data)
-            detailed_monsters.append(monster)
+        # Step 3: Fetch details for selected monsters concurrently, processing each as it arrives
+        detailed_monsters = self.client.fetch_and_process_many([m.url for m in selected_monsters])
         
         assert len(detailed_monsters) == 2
-        assert all(isinstance(m, Monster) for m in detailed_monsters)
+        assert {type(m) for m in detailed_monsters} == {Monster}
         
         # Step 4: Save to JSON
-        output_file = os.path.join(self.temp_dir, "test_monsters.json")
+        output_file = tmp_path / "test_monsters.json"
         saved_file = self.client.save_monsters_to_json(detailed_monsters, output_file)
         
         # Verify output
         assert saved_file == output_file
-        assert os.path.exists(output_file)
+        assert output_file.exists()
         
         # Verify JSON content
-        with open(output_file, 'r') as f:
-            data = json.load(f)
+        data = orjson.loads(output_file.read_bytes())
         
         assert len(data) == 2
-        assert all("name" in monster for monster in data)
-        assert all("hit_points" in monster for monster in data)
-        assert all("armor_class" in monster for monster in data)
-        assert all("actions" in monster for monster in data)
+        for monster in data:
+            missing = REQUIRED_FIELDS - monster.keys()
+            assert not missing, missing
     
-    def test_pipeline_data_validation(self):
+    def test_pipeline_data_validation(self, tmp_path):
         """Test that pipeline produces valid data structures."""
         # Create test monsters
         monsters = [
@@ -140,19 +134,16 @@ class TestPipelineIntegration:
         ]
         
         # Save to temp file
-        output_file = os.path.join(self.temp_dir, "validation_test.json")
+        output_file = tmp_path / "validation_test.json"
         self.client.save_monsters_to_json(monsters, output_file)
         
         # Load and validate structure
-        with open(output_file, 'r') as f:
-            data = json.load(f)
+        data = orjson.loads(output_file.read_bytes())
         
         # Validate required fields
         for monster_data in data:
-            assert "name" in monster_data
-            assert "hit_points" in monster_data
-            assert "armor_class" in monster_data
-            assert "actions" in monster_data
+            missing = REQUIRED_FIELDS - monster_data.keys()
+            assert not missing, missing
             
             # Validate types - hit_points and armor_class can be None (honest extraction)
             assert isinstance(monster_data["name"], str)
@@ -167,6 +158,20 @@ class TestPipelineIntegration:
                 assert isinstance(action["name"], str)
                 assert isinstance(action["desc"], str)
     
+    def test_save_monster_dicts_matches_models(self, tmp_path):
+        """Test saving XCom-style dicts produces the same file as saving Monsters."""
+        monsters = [
+            Monster(name="Goblin", hit_points=7, armor_class=15, actions=[{"name": "Scimitar", "desc": "Slash"}]),
+            Monster(name="Ghost", hit_points=None, armor_class=None, actions=[])
+        ]
+        
+        models_file = tmp_path / "models.json"
+        dicts_file = tmp_path / "dicts.json"
+        self.client.save_monsters_to_json(monsters, models_file)
+        self.client.save_monsters_dicts_to_json([m.model_dump() for m in monsters], dicts_file)
+        
+        assert models_file.read_bytes() == dicts_file.read_bytes()
+    
     def test_pipeline_error_handling(self):
         """Test pipeline behavior with various error conditions."""
         # Test empty monsters list - should return empty list, not raise error
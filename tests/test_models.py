@@ -5,7 +5,7 @@ Unit tests for Pydantic models.
 import pytest
 from pydantic import ValidationError
 
-from src.pipeline.transformation.models import Action, Monster, MonsterSummary, APIResponse
+from src.pipeline.transformation.models import Action, Monster, MonsterSummary
 
 
 class TestAction:
@@ -154,34 +154,15 @@ class TestMonsterSummary:
         assert summary.name == "Goblin"
         assert summary.url == "/api/monsters/goblin"
     
+    def test_monster_summary_is_immutable(self):
+        """Test MonsterSummary is a frozen, slotted record."""
+        summary = MonsterSummary(index="goblin", name="Goblin", url="/api/monsters/goblin")
+        
+        with pytest.raises(AttributeError):
+            summary.name = "Hobgoblin"
+        assert not hasattr(summary, "__dict__")
+    
     def test_monster_summary_missing_fields(self):
         """Test MonsterSummary validation with missing fields."""
-        with pytest.raises(ValidationError):
+        with pytest.raises(TypeError):
             MonsterSummary(index="goblin", name="Goblin")  # Missing url
-
-
-class TestAPIResponse:
-    """Test APIResponse model validation."""
-    
-    def test_valid_api_response(self):
-        """Test creating a valid APIResponse."""
-        summaries = [
-            MonsterSummary(index="goblin", name="Goblin", url="/api/monsters/goblin"),
-            MonsterSummary(index="skeleton", name="Skeleton", url="/api/monsters/skeleton")
-        ]
-        
-        response = APIResponse(
-            count=2,
-            results=summaries
-        )
-        
-        assert response.count == 2
-        assert len(response.results) == 2
-        assert response.results[0].name == "Goblin"
-    
-    def test_api_response_empty_results(self):
-        """Test APIResponse with empty results."""
-        response = APIResponse(count=0, results=[])
-        
-        assert response.count == 0
-        assert response.results == []
@@ -4,7 +4,8 @@ Unit tests for task functions.
 
 import pytest
 import json
-from unittest.mock import Mock, patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch
 
 from src.pipeline.transformation.tasks import (
     fetch_monsters_task,
@@ -12,21 +13,27 @@ from src.pipeline.transformation.tasks import (
     fetch_monster_details_task,
     save_monsters_task
 )
-from src.pipeline.transformation.models import Monster, MonsterSummary
+from src.pipeline.transformation.models import Monster
+
+
+def _ti(data):
+    """Lightweight TaskInstance stub whose xcom_pull returns data."""
+    return SimpleNamespace(xcom_pull=lambda task_ids=None, **kwargs: data)
 
 
 class TestTasks:
     """Test pipeline task functions."""
     
-    @patch('src.pipeline.transformation.tasks._client')
-    def test_fetch_monsters_task(self, mock_client):
+    @patch('src.pipeline.transformation.tasks._get_client')
+    def test_fetch_monsters_task(self, mock_get_client):
         """Test fetch_monsters_task function with simple limiting."""
+        mock_client = mock_get_client.return_value
         # Setup mock
         mock_monsters = [
-            MonsterSummary(index="goblin", name="Goblin", url="/api/monsters/goblin"),
-            MonsterSummary(index="skeleton", name="Skeleton", url="/api/monsters/skeleton")
+            {"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"},
+            {"index": "skeleton", "name": "Skeleton", "url": "/api/monsters/skeleton"}
         ]
-        mock_client.fetch_monsters_list.return_value = mock_monsters
+        mock_client.fetch_monsters_data.return_value = mock_monsters
         
         # Execute 
         context = {}
@@ -36,15 +43,15 @@ class TestTasks:
         assert len(result) == 2
         assert result[0]["name"] == "Goblin"
         assert result[1]["name"] == "Skeleton"
-        mock_client.fetch_monsters_list.assert_called_once_with(limit=None)
+        mock_client.fetch_monsters_data.assert_called_once_with(limit=None)
     
-    @patch('src.pipeline.transformation.tasks._client')
-    def test_select_random_monsters_task(self, mock_client):
+    @patch('src.pipeline.transformation.tasks._get_client')
+    def test_select_random_monsters_task(self, mock_get_client):
         """Test select_random_monsters_task function."""
+        mock_client = mock_get_client.return_value
         # Setup mock context with XCom data
         mock_context = {
-            'count': 3,
-            'ti': Mock()
+            'count': 3
         }
         
         # Mock XCom data (serialized monsters)
@@ -52,15 +59,11 @@ class TestTasks:
             {"index": f"monster{i}", "name": f"Monster {i}", "url": f"/api/monsters/monster{i}"}
             for i in range(10)
         ]
-        mock_context['ti'].xcom_pull.return_value = monsters_data
+        mock_context['ti'] = _ti(monsters_data)
         
         # Setup client mock
-        selected_monsters = [
-            MonsterSummary(index="monster1", name="Monster 1", url="/api/monsters/monster1"),
-            MonsterSummary(index="monster5", name="Monster 5", url="/api/monsters/monster5"),
-            MonsterSummary(index="monster8", name="Monster 8", url="/api/monsters/monster8")
-        ]
-        mock_client.select_random_monsters.return_value = selected_monsters
+        selected_monsters = [monsters_data[1], monsters_data[5], monsters_data[8]]
+        mock_client.select_random_dicts.return_value = selected_monsters
         
         # Execute
         result = select_random_monsters_task(**mock_context)
@@ -68,19 +71,17 @@ class TestTasks:
         # Verify
         assert len(result) == 3
         assert all("name" in monster for monster in result)
-        mock_client.select_random_monsters.assert_called_once()
+        mock_client.select_random_dicts.assert_called_once()
         
-        # Verify it was called with correct count
-        call_args = mock_client.select_random_monsters.call_args
+        # Verify it was called with the raw XCom dicts and correct count
+        call_args = mock_client.select_random_dicts.call_args
+        assert call_args[0][0] is monsters_data
         assert call_args[0][1] == 3  # count parameter
     
     def test_select_random_monsters_task_no_data(self):
         """Test select_random_monsters_task with no XCom data."""
         # Setup mock context with no data
-        mock_context = {
-            'ti': Mock()
-        }
-        mock_context['ti'].xcom_pull.return_value = None
+        mock_context = {'ti': _ti(None)}
         
         # Execute and verify exception
         with pytest.raises(ValueError) as exc_info:
@@ -88,31 +89,26 @@ class TestTasks:
         
         assert "No monster data received" in str(exc_info.value)
     
-    @patch('src.pipeline.transformation.tasks._client')
-    def test_fetch_monster_details_task(self, mock_client):
+    @patch('src.pipeline.transformation.tasks._get_client')
+    def test_fetch_monster_details_task(self, mock_get_client):
         """Test fetch_monster_details_task function."""
+        mock_client = mock_get_client.return_value
         # Setup mock context
-        mock_context = {
-            'ti': Mock()
-        }
+        mock_context = {}
         
         # Mock XCom data (selected monsters)
         selected_monsters_data = [
             {"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"},
             {"index": "skeleton", "name": "Skeleton", "url": "/api/monsters/skeleton"}
         ]
-        mock_context['ti'].xcom_pull.return_value = selected_monsters_data
+        mock_context['ti'] = _ti(selected_monsters_data)
         
-        # Mock detailed monsters
-        detailed_monsters = [
+        # Mock the client method
+        mock_client.fetch_and_process_many.return_value = [
             Monster(name="Goblin", hit_points=15, armor_class=12, actions=[]),
             Monster(name="Skeleton", hit_points=13, armor_class=13, actions=[])
         ]
         
-        # Mock the client methods
-        mock_client.fetch_monster_details.return_value = {"raw": "data"}
-        mock_client.process_monster_data.side_effect = detailed_monsters
-        
         # Execute
         result = fetch_monster_details_task(**mock_context)
         
@@ -120,35 +116,27 @@ class TestTasks:
         assert len(result) == 2
         assert result[0]["name"] == "Goblin"
         assert result[1]["name"] == "Skeleton"
-        assert mock_client.fetch_monster_details.call_count == 2
-        assert mock_client.process_monster_data.call_count == 2
+        mock_client.fetch_and_process_many.assert_called_once_with(
+            ["/api/monsters/goblin", "/api/monsters/skeleton"]
+        )
     
-    @patch('src.pipeline.transformation.tasks._client')
-    def test_fetch_monster_details_task_with_errors(self, mock_client):
+    @patch('src.pipeline.transformation.tasks._get_client')
+    def test_fetch_monster_details_task_with_errors(self, mock_get_client):
         """Test fetch_monster_details_task with some monsters failing."""
+        mock_client = mock_get_client.return_value
         # Setup mock context
-        mock_context = {
-            'ti': Mock()
-        }
+        mock_context = {}
         
         selected_monsters_data = [
             {"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"},
             {"index": "skeleton", "name": "Skeleton", "url": "/api/monsters/skeleton"}
         ]
-        mock_context['ti'].xcom_pull.return_value = selected_monsters_data
-        
-        # Mock one success, one failure
-        def side_effect_details(url):
-            if "goblin" in url:
-                return {"raw": "data"}
-            else:
-                raise Exception("API Error")
+        mock_context['ti'] = _ti(selected_monsters_data)
         
-        def side_effect_process(data):
-            return Monster(name="Goblin", hit_points=15, armor_class=12, actions=[])
-        
-        mock_client.fetch_monster_details.side_effect = side_effect_details
-        mock_client.process_monster_data.side_effect = side_effect_process
+        # Mock one success, one failure skipped by the client
+        mock_client.fetch_and_process_many.return_value = [
+            Monster(name="Goblin", hit_points=15, armor_class=12, actions=[])
+        ]
         
         # Execute
         result = fetch_monster_details_task(**mock_context)
@@ -157,13 +145,13 @@ class TestTasks:
         assert len(result) == 1
         assert result[0]["name"] == "Goblin"
     
-    @patch('src.pipeline.transformation.tasks._client')
-    def test_save_monsters_task(self, mock_client):
+    @patch('src.pipeline.transformation.tasks._get_client')
+    def test_save_monsters_task(self, mock_get_client):
         """Test save_monsters_task function."""
+        mock_client = mock_get_client.return_value
         # Setup mock context
         mock_context = {
-            'output_file': 'test_output.json',
-            'ti': Mock()
+            'output_file': 'test_output.json'
         }
         
         # Mock XCom data (monster details)
@@ -171,42 +159,40 @@ class TestTasks:
             {"name": "Goblin", "hit_points": 15, "armor_class": 12, "actions": []},
             {"name": "Skeleton", "hit_points": 13, "armor_class": 13, "actions": []}
         ]
-        mock_context['ti'].xcom_pull.return_value = monsters_data
+        mock_context['ti'] = _ti(monsters_data)
         
         # Mock the save method
-        mock_client.save_monsters_to_json.return_value = 'test_output.json'
+        mock_client.save_monsters_dicts_to_json.return_value = 'test_output.json'
         
         # Execute
         result = save_monsters_task(**mock_context)
         
         # Verify
         assert result == 'test_output.json'
-        mock_client.save_monsters_to_json.assert_called_once()
+        mock_client.save_monsters_dicts_to_json.assert_called_once()
         
-        # Verify the monsters passed to save method
-        call_args = mock_client.save_monsters_to_json.call_args[0]
+        # Verify the XCom dicts are passed through without rebuilding Monsters
+        call_args = mock_client.save_monsters_dicts_to_json.call_args[0]
         monsters_list = call_args[0]
-        assert len(monsters_list) == 2
-        assert all(isinstance(monster, Monster) for monster in monsters_list)
+        assert monsters_list is monsters_data
     
-    @patch('src.pipeline.transformation.tasks._client')
-    def test_save_monsters_task_default_filename(self, mock_client):
+    @patch('src.pipeline.transformation.tasks._get_client')
+    def test_save_monsters_task_default_filename(self, mock_get_client):
         """Test save_monsters_task with default filename."""
+        mock_client = mock_get_client.return_value
         # Setup mock context without output_file
-        mock_context = {
-            'ti': Mock()
-        }
+        mock_context = {}
         
         monsters_data = [
             {"name": "Goblin", "hit_points": 15, "armor_class": 12, "actions": []}
         ]
-        mock_context['ti'].xcom_pull.return_value = monsters_data
+        mock_context['ti'] = _ti(monsters_data)
         
-        mock_client.save_monsters_to_json.return_value = 'monsters.json'
+        mock_client.save_monsters_dicts_to_json.return_value = 'monsters.json'
         
         # Execute
         result = save_monsters_task(**mock_context)
         
         # Verify default filename was used
-        call_args = mock_client.save_monsters_to_json.call_args
+        call_args = mock_client.save_monsters_dicts_to_json.call_args
         assert call_args[0][1] == 'monsters.json'  # Default filename
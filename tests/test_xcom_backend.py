@@ -0,0 +1,74 @@
+"""
+Unit tests for the msgpack XCom backend.
+"""
+
+import pytest
+from types import SimpleNamespace
+
+pytest.importorskip("airflow")
+
+from src.pipeline import xcom_backend
+from src.pipeline.xcom_backend import MsgpackXCom, remove_run_files
+
+
+class TestMsgpackXCom:
+    """Test MsgpackXCom serialization."""
+    
+    def test_small_value_stored_inline(self):
+        """Test small payloads are packed inline."""
+        value = [{"index": "goblin", "name": "Goblin", "url": "/api/monsters/goblin"}]
+        
+        stored = MsgpackXCom.serialize_value(value)
+        
+        assert stored.startswith(b"I")
+        assert MsgpackXCom.deserialize_value(SimpleNamespace(value=stored)) == value
+    
+    def test_large_value_spilled_to_file(self, tmp_path, monkeypatch):
+        """Test large payloads are written to disk and referenced by path."""
+        monkeypatch.setattr(xcom_backend, "XCOM_DIR", str(tmp_path))
+        value = [
+            {"index": f"monster{i}", "name": f"Monster {i}", "url": f"/api/monsters/monster{i}"}
+            for i in range(100)
+        ]
+        
+        stored = MsgpackXCom.serialize_value(
+            value, key="return_value", task_id="fetch_monsters", dag_id="dnd", run_id="run1"
+        )
+        
+        assert stored.startswith(b"R")
+        assert (tmp_path / "dnd" / "run1" / "fetch_monsters.-1.return_value.msgpack").exists()
+        assert MsgpackXCom.deserialize_value(SimpleNamespace(value=stored)) == value
+    
+    def test_purge_removes_spilled_file(self, tmp_path, monkeypatch):
+        """Test clearing an XCom deletes its spilled file."""
+        monkeypatch.setattr(xcom_backend, "XCOM_DIR", str(tmp_path))
+        stored = MsgpackXCom.serialize_value(
+            ["x" * 100] * 20, key="return_value", task_id="fetch_monsters", dag_id="dnd", run_id="run1"
+        )
+        
+        MsgpackXCom.purge(SimpleNamespace(value=stored), session=None)
+        MsgpackXCom.purge(SimpleNamespace(value=stored), session=None)  # Already gone is fine
+        
+        assert not (tmp_path / "dnd" / "run1" / "fetch_monsters.-1.return_value.msgpack").exists()
+    
+    def test_overwrite_reuses_spill_file(self, tmp_path, monkeypatch):
+        """Test pushing the same XCom again replaces its file instead of adding one."""
+        monkeypatch.setattr(xcom_backend, "XCOM_DIR", str(tmp_path))
+        ids = dict(key="return_value", task_id="fetch_monsters", dag_id="dnd", run_id="run1")
+        
+        MsgpackXCom.serialize_value(["old" * 100] * 20, **ids)
+        stored = MsgpackXCom.serialize_value(["new" * 100] * 20, **ids)
+        
+        assert len(list((tmp_path / "dnd" / "run1").iterdir())) == 1
+        assert MsgpackXCom.deserialize_value(SimpleNamespace(value=stored)) == ["new" * 100] * 20
+    
+    def test_remove_run_files(self, tmp_path, monkeypatch):
+        """Test the DAG callback removes the run's spill directory."""
+        monkeypatch.setattr(xcom_backend, "XCOM_DIR", str(tmp_path))
+        MsgpackXCom.serialize_value(
+            ["x" * 100] * 20, key="return_value", task_id="fetch_monsters", dag_id="dnd", run_id="run1"
+        )
+        
+        remove_run_files({"dag_run": SimpleNamespace(dag_id="dnd", run_id="run1")})
+        
+        assert not (tmp_path / "dnd" / "run1").exists()